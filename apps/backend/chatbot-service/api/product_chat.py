@@ -2,28 +2,16 @@
 from fastapi import APIRouter, Header
 from schemas.chat import ProductChatRequest
 from schemas.response import APIResponse
+from schemas.product import serialize_product
 from repositories.mongo_product_repo import MongoProductRepository
 from core.llm_client import GeminiClient
 from core.mongo_client import get_mongo_collection
+from core.serialization import dumps
 import json
 
 router = APIRouter()
 llm = GeminiClient()
 
-def serialize_product(product):
-    if not product:
-        return {}
-    return {
-        "id": product.get("_id", ""),
-        "name": product.get("name", ""),
-        "categoryId": product.get("categoryId", None),
-        "details": product.get("details", {}),
-        "isFeatured": product.get("isFeatured", None),
-        "isActive": product.get("isActive", None),
-        "createdAt": str(product.get("createdAt", "")),
-        "updatedAt": str(product.get("updatedAt", ""))
-    }
-
 def load_prompt_template(path):
     with open(path, 'r') as f:
         return json.load(f)
@@ -41,7 +29,7 @@ def product_chat(
     prompt_template = load_prompt_template("prompts/product_chat.json")
     system_prompt = prompt_template["system"]
     user_prompt = payload.message
-    context = prompt_template["context"].format(product_details=json.dumps(product_details, ensure_ascii=False, indent=2))
+    context = prompt_template["context"].format(product_details=dumps(product_details, pretty=True))
 
     reply = llm.generate(
         user_prompt=user_prompt,
@@ -0,0 +1,108 @@
+"""
+Recall-versus-latency benchmark for quantized (int8) embedding search with exact rescoring.
+
+For every (dimensions, rescore_factor, rescore_dimensions) setting it reports recall@k of the
+two-phase search against exact full-precision search, the time of the rescoring step, and the
+bytes of `embedding` the aggregation ships back per query. Rescoring is timed through the same
+`core.vector_quantization.rescore` the repository uses, on Python lists as returned by pymongo,
+and the transfer size is the BSON encoding of the projected vectors. The candidate scan is a
+brute-force numpy pass, so scan_ms is not Atlas's HNSW latency; it is only there for scale.
+Synthetic vectors have no Matryoshka structure, so truncation recall is only representative
+with --from-mongo.
+
+Requires numpy (benchmark only). Run from the service root:
+    python -m benchmarks.bench_quantized_search                 # synthetic 3072-d vectors
+    python -m benchmarks.bench_quantized_search --from-mongo    # real product embeddings
+"""
+import argparse
+import time
+
+import bson
+import numpy as np
+
+from core.vector_quantization import quantize_int8, rescore, truncate
+
+
+def synthetic_vectors(num_docs, num_queries, dims, clusters=40, seed=7):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dims))
+    docs = centers[rng.integers(clusters, size=num_docs)] + 0.6 * rng.normal(size=(num_docs, dims))
+    queries = centers[rng.integers(clusters, size=num_queries)] + 0.6 * rng.normal(size=(num_queries, dims))
+    return docs.tolist(), queries.tolist()
+
+
+def mongo_vectors(num_queries):
+    from core.mongo_client import get_mongo_collection
+    docs = [d["embedding"] for d in get_mongo_collection().find({"embedding": {"$exists": True}}, {"embedding": 1})]
+    rng = np.random.default_rng(7)
+    # Perturbed documents stand in for queries so the benchmark needs no embedding API calls
+    picks = rng.choice(len(docs), size=min(num_queries, len(docs)), replace=False)
+    queries = [(np.asarray(docs[i]) + 0.02 * rng.normal(size=len(docs[i]))).tolist() for i in picks]
+    return docs, queries
+
+
+def normalize(matrix):
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def run(docs, queries, k, dims_options, factors, rescore_dims_options):
+    full = normalize(np.asarray(docs, dtype=np.float32))
+    full_queries = normalize(np.asarray(queries, dtype=np.float32))
+    exact_top = np.argsort(-(full_queries @ full.T), axis=1)[:, :k]
+    full_dims = full.shape[1]
+
+    print(f"docs={len(docs)} queries={len(queries)} full_dims={full_dims} k={k}")
+    print(f"{'dims':>6} {'factor':>6} {'rescore_dims':>12} {'recall@k':>9} {'scan_ms':>8} "
+          f"{'rescore_ms':>10} {'kb/query':>9}")
+    for dims in dims_options:
+        quantized = np.asarray([quantize_int8(truncate(d, dims)) for d in docs], dtype=np.int8).astype(np.float32)
+        quantized = normalize(quantized)
+        quantized_queries = normalize(np.asarray([quantize_int8(truncate(q, dims)) for q in queries], dtype=np.float32))
+        for factor in factors:
+            candidates = k * factor
+            approx_ids = []
+            scan_time = 0.0
+            for qi in range(len(queries)):
+                start = time.perf_counter()
+                approx_ids.append(np.argpartition(-(quantized @ quantized_queries[qi]), candidates)[:candidates])
+                scan_time += time.perf_counter() - start
+            for rescore_dims in rescore_dims_options:
+                prefix = rescore_dims or full_dims
+                hits, rescore_time, transferred = 0, 0.0, 0
+                for qi, approx in enumerate(approx_ids):
+                    # What the $slice projection returns: plain float lists of the leading dimensions
+                    candidates_docs = [{"_id": int(i), "approxScore": 0.0, "embedding": docs[i][:prefix]} for i in approx]
+                    transferred += sum(len(bson.encode({"embedding": d["embedding"]})) for d in candidates_docs)
+                    start = time.perf_counter()
+                    top = rescore(queries[qi], candidates_docs, k, rescore_dims)
+                    rescore_time += time.perf_counter() - start
+                    hits += len({d["_id"] for d in top} & set(exact_top[qi].tolist()))
+                n = len(queries)
+                print(f"{dims:>6} {factor:>6} {prefix:>12} {hits / (n * k):>9.3f} {1000 * scan_time / n:>8.3f} "
+                      f"{1000 * rescore_time / n:>10.3f} {transferred / n / 1024:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from-mongo", action="store_true", help="use stored product embeddings")
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dims", type=int, default=3072, help="dimensionality of synthetic vectors")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--truncate", type=int, nargs="+", default=[3072, 1536, 768, 256])
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rescore-dims", type=int, nargs="+", default=[0, 1536, 768],
+                        help="leading dimensions fetched for rescoring (0 = full vector)")
+    args = parser.parse_args()
+
+    if args.from_mongo:
+        docs, queries = mongo_vectors(args.queries)
+    else:
+        docs, queries = synthetic_vectors(args.docs, args.queries, args.dims)
+    full_dims = len(docs[0])
+    run(docs, queries, args.k, [d for d in args.truncate if d <= full_dims], args.factors,
+        [d or None for d in args.rescore_dims if d <= full_dims])
+
+
+if __name__ == "__main__":
+    main()
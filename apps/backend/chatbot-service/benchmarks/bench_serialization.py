@@ -0,0 +1,79 @@
+"""
+Micro-benchmark: legacy response path (jsonable_encoder + json.dumps) vs FastJSONResponse.
+
+Run from the service root:
+    python -m benchmarks.bench_serialization [num_products]
+"""
+import json
+import sys
+import timeit
+from datetime import datetime
+
+from bson import Decimal128, ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from core.serialization import FastJSONResponse
+from schemas.product import serialize_product
+
+
+def make_product(i):
+    return {
+        "_id": ObjectId(),
+        "name": f"Product {i}",
+        "categoryId": f"cat-{i % 15}",
+        "details": {
+            "interestRate": Decimal128(f"{5 + i % 7}.25"),
+            "annualFee": Decimal128("1500.00"),
+            "minimumBalance": 1000 + i,
+            "eligibility": ["Sri Lankan citizen", "Age 18+", "Salaried or self-employed"],
+            "features": [f"Feature {j}" for j in range(10)],
+            "benefits": {"cashback": "2%", "travelPerks": ["Lounge access", "Travel insurance"]},
+        },
+        "isFeatured": i % 3 == 0,
+        "isActive": True,
+        "createdAt": datetime(2025, 1, 1, 12, 30),
+        "updatedAt": datetime(2025, 12, 1, 8, 0),
+    }
+
+
+def legacy_serialize_product(product):
+    # Pre-refactor shape: ids and dates stringified by hand, BSON decimals unsupported
+    details = {k: str(v) if isinstance(v, Decimal128) else v for k, v in product["details"].items()}
+    return {
+        "id": str(product["_id"]),
+        "name": product["name"],
+        "categoryId": product["categoryId"],
+        "details": details,
+        "isFeatured": product["isFeatured"],
+        "isActive": product["isActive"],
+        "createdAt": str(product["createdAt"]),
+        "updatedAt": str(product["updatedAt"]),
+    }
+
+
+def envelope(data):
+    return {"success": True, "message": "OK", "data": data, "meta": {"timestamp": datetime.utcnow().isoformat()}}
+
+
+def main(num_products=50, number=200):
+    products = [make_product(i) for i in range(num_products)]
+    summary = "## Comparison Summary\n" * 40
+
+    def legacy():
+        payload = envelope({"products": [legacy_serialize_product(p) for p in products], "summary": summary})
+        return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def fast():
+        payload = envelope({"products": [serialize_product(p) for p in products], "summary": summary})
+        return FastJSONResponse(payload).body
+
+    legacy_time = min(timeit.repeat(legacy, number=number, repeat=5)) / number
+    fast_time = min(timeit.repeat(fast, number=number, repeat=5)) / number
+    print(f"products per payload: {num_products}")
+    print(f"legacy jsonable_encoder + json.dumps: {legacy_time * 1e6:9.1f} us")
+    print(f"FastJSONResponse (orjson):            {fast_time * 1e6:9.1f} us")
+    print(f"speedup: {legacy_time / fast_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
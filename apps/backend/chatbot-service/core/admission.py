@@ -0,0 +1,225 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from core.config import settings
+from schemas.response import APIResponse
+
+# Lower value is served first: interactive product chat ahead of general chat ahead of bulk comparison
+ROUTE_PRIORITIES = {
+    "/product-chat": 0,
+    "/chat": 1,
+    "/compare-products": 2,
+}
+# Idle buckets are dropped once they would be full again anyway
+BUCKET_PRUNE_INTERVAL = 300
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second, burst, now=None):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic() if now is None else now
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, now):
+        self.refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def seconds_until_token(self):
+        return (1 - self.tokens) / self.rate if self.rate else 60.0
+
+
+class AdmissionMetrics:
+    def __init__(self):
+        self.admitted = {}
+        self.shed = {}
+        self.queue_wait_count = {}
+        self.queue_wait_total = {}
+        self.queue_wait_max = {}
+
+    def record_admitted(self, priority, waited):
+        self.admitted[priority] = self.admitted.get(priority, 0) + 1
+        self.queue_wait_count[priority] = self.queue_wait_count.get(priority, 0) + 1
+        self.queue_wait_total[priority] = self.queue_wait_total.get(priority, 0.0) + waited
+        self.queue_wait_max[priority] = max(self.queue_wait_max.get(priority, 0.0), waited)
+
+    def record_shed(self, priority, reason):
+        key = (priority, reason)
+        self.shed[key] = self.shed.get(key, 0) + 1
+
+
+class AdmissionController:
+    """
+    Per-user token buckets plus a global concurrency cap with a priority queue.
+
+    Runs on the event loop, so waiting requests hold no threadpool slot. A request that
+    cannot start within the queue deadline (or finds the queue full of equal or higher
+    priority work, or its user out of tokens) is rejected with AdmissionRejected instead
+    of piling more work on the LLM.
+    """
+    def __init__(self, max_concurrent, max_queue, queue_deadline, user_rate_per_minute, user_burst):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_deadline = queue_deadline
+        self.user_rate = user_rate_per_minute / 60.0
+        self.user_burst = user_burst
+        self.active = 0
+        self.queue = []
+        self.buckets = {}
+        self.metrics = AdmissionMetrics()
+        self._seq = itertools.count()
+        self._last_prune = time.monotonic()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            settings.ADMISSION_MAX_CONCURRENT,
+            settings.ADMISSION_MAX_QUEUE,
+            settings.ADMISSION_QUEUE_DEADLINE_SECONDS,
+            settings.ADMISSION_USER_RATE_PER_MINUTE,
+            settings.ADMISSION_USER_BURST,
+        )
+
+    async def acquire(self, user_id, priority):
+        now = time.monotonic()
+        self._check_rate(user_id, priority, now)
+
+        if self.active < self.max_concurrent and not self._queued():
+            self.active += 1
+            self.metrics.record_admitted(priority, 0.0)
+            return
+        if self._queued() >= self.max_queue and not self._evict_lower_priority(priority):
+            self._shed(priority, "queue_full", self.queue_deadline)
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.queue, (priority, next(self._seq), waiter))
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=self.queue_deadline)
+        except asyncio.CancelledError:
+            # Client went away while queued; hand the slot on if it was already granted
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release()
+            waiter.cancel()
+            raise
+        if not done:
+            waiter.cancel()
+            self._shed(priority, "deadline", self.queue_deadline)
+        if not waiter.result():
+            self._shed(priority, "evicted", self.queue_deadline)
+        self.metrics.record_admitted(priority, time.monotonic() - now)
+
+    def release(self):
+        """Hand the slot to the highest-priority live waiter, or free it."""
+        while self.queue:
+            _, _, waiter = heapq.heappop(self.queue)
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def snapshot(self):
+        return {
+            "active": self.active,
+            "queued": self._queued(),
+            "maxConcurrent": self.max_concurrent,
+            "admitted": {str(p): n for p, n in self.metrics.admitted.items()},
+            "shed": {f"{p}:{reason}": n for (p, reason), n in self.metrics.shed.items()},
+            "queueWaitSeconds": {
+                str(p): {
+                    "count": count,
+                    "avg": self.metrics.queue_wait_total[p] / count,
+                    "max": self.metrics.queue_wait_max[p],
+                }
+                for p, count in self.metrics.queue_wait_count.items()
+            },
+        }
+
+    def _evict_lower_priority(self, priority):
+        """Make room in a full queue by rejecting the newest waiter of a lower priority class."""
+        live = [entry for entry in self.queue if not entry[2].done()]
+        if not live:
+            return False
+        worst = max(live, key=lambda entry: (entry[0], entry[1]))
+        if worst[0] <= priority:
+            return False
+        worst[2].set_result(False)
+        return True
+
+    def _queued(self):
+        return sum(1 for _, _, waiter in self.queue if not waiter.done())
+
+    def _check_rate(self, user_id, priority, now):
+        if now - self._last_prune > BUCKET_PRUNE_INTERVAL:
+            idle = self.user_burst / self.user_rate if self.user_rate else BUCKET_PRUNE_INTERVAL
+            self.buckets = {u: b for u, b in self.buckets.items() if now - b.updated < idle}
+            self._last_prune = now
+        bucket = self.buckets.get(user_id)
+        if bucket is None:
+            bucket = self.buckets[user_id] = TokenBucket(self.user_rate, self.user_burst, now)
+        if not bucket.consume(now):
+            self._shed(priority, "rate_limited", bucket.seconds_until_token())
+
+    def _shed(self, priority, reason, retry_after):
+        self.metrics.record_shed(priority, reason)
+        raise AdmissionRejected(reason, retry_after)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying AdmissionController to the LLM-backed routes in ROUTE_PRIORITIES."""
+    def __init__(self, app, controller, priorities=None):
+        self.app = app
+        self.controller = controller
+        self.priorities = priorities or ROUTE_PRIORITIES
+
+    async def __call__(self, scope, receive, send):
+        priority = self.priorities.get(scope["path"].rstrip("/")) if scope["type"] == "http" else None
+        if priority is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(self._caller(scope), priority)
+        except AdmissionRejected as e:
+            response = APIResponse.error(
+                "Too many requests, please retry later",
+                "RATE_LIMITED" if e.reason == "rate_limited" else "OVERLOADED",
+                429,
+                details=e.reason,
+                headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+    def _caller(self, scope):
+        """
+        Bucket key: client address plus x-user-id. The bundled UI sends the same user id from
+        every browser and /compare-products sends none, so the address keeps distinct clients
+        apart. Behind gunicorn/App Service the socket peer is the proxy, so the last
+        X-Forwarded-For hop (the one appended by that proxy, not the client) is used instead.
+        """
+        headers = dict(scope["headers"])
+        forwarded = headers.get(b"x-forwarded-for", b"").decode("latin-1").split(",")[-1].strip()
+        client = scope.get("client")
+        address = forwarded or (client[0] if client else "unknown")
+        user_id = headers.get(b"x-user-id", b"").decode("latin-1") or "anonymous"
+        return f"{address}|{user_id}"
@@ -10,5 +10,31 @@ class Settings:
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     GEMINI_MODEL_ID = os.getenv("GEMINI_MODEL_ID")
     ENV = os.getenv("ENV", "dev")
+    # "exact" searches the full-precision embedding; "quantized" searches the int8 field then rescores
+    VECTOR_SEARCH_MODE = os.getenv("VECTOR_SEARCH_MODE", "exact")
+    # Optional Matryoshka truncation for the quantized field (e.g. 768); unset keeps all 3072 dimensions
+    EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0")) or None
+    # Candidates fetched from the quantized index per requested result, before exact rescoring
+    RESCORE_FACTOR = int(os.getenv("RESCORE_FACTOR", "4"))
+    # Leading dimensions of the full-precision vector fetched for rescoring; unset fetches all 3072
+    RESCORE_DIMENSIONS = int(os.getenv("RESCORE_DIMENSIONS", "0")) or None
+    # Export of the banking service's Institute table ({id, name}); maps names in questions to institutionId
+    INSTITUTIONS_FILE = os.getenv("INSTITUTIONS_FILE", "fixtures/institutions.json")
+    # "yahoo" or "fixture"; the fixture file stands in for Yahoo Finance in dev/offline setups
+    MARKET_SNAPSHOT_SOURCE = os.getenv("MARKET_SNAPSHOT_SOURCE", "yahoo")
+    MARKET_SNAPSHOT_FIXTURE = os.getenv("MARKET_SNAPSHOT_FIXTURE", "fixtures/market_snapshot.json")
+    # Shared by all workers on the host; one worker refreshes it, the others just reload it
+    MARKET_SNAPSHOT_CACHE_PATH = os.getenv("MARKET_SNAPSHOT_CACHE_PATH", "/tmp/finverse_market_snapshot.json")
+    MARKET_SNAPSHOT_REFRESH_SECONDS = int(os.getenv("MARKET_SNAPSHOT_REFRESH_SECONDS", "900"))
+    # Older snapshots are dropped from prompts rather than shown as current data
+    MARKET_SNAPSHOT_MAX_STALE_SECONDS = int(os.getenv("MARKET_SNAPSHOT_MAX_STALE_SECONDS", "86400"))
+    # Admission control, per worker process (gunicorn runs 4): size to the LLM gateway's capacity
+    ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+    # Requests still queued after this many seconds are shed with 429
+    ADMISSION_QUEUE_DEADLINE_SECONDS = float(os.getenv("ADMISSION_QUEUE_DEADLINE_SECONDS", "10"))
+    # Per-user token bucket: sustained requests per minute and burst size
+    ADMISSION_USER_RATE_PER_MINUTE = float(os.getenv("ADMISSION_USER_RATE_PER_MINUTE", "20"))
+    ADMISSION_USER_BURST = int(os.getenv("ADMISSION_USER_BURST", "5"))
 
 settings = Settings()
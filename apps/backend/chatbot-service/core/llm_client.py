@@ -37,4 +37,12 @@ class GeminiClient:
             )
             return response.text
         except Exception as e:
-            return f"Error: {str(e)}"
\ No newline at end of file
+            return f"Error: {str(e)}"
+
+    def generate_json(self, prompt: str) -> str:
+        """Send `prompt` as-is (no system prompt or Markdown instructions) for machine-readable output. Raises on failure."""
+        response = self.client.models.generate_content(
+            model=self.model_id,
+            contents=prompt
+        )
+        return response.text
@@ -2,6 +2,8 @@ import os
 import json
 import logging
 from core.llm_client import GeminiClient
+from services.market_snapshot import get_market_snapshot_service
+from services.query_filters import QueryFilterExtractor
 
 logger = logging.getLogger("llm")
 logger.setLevel(logging.INFO)
@@ -36,10 +38,18 @@ def filter_products_by_name(products, message):
     return filtered if filtered else products
 
 class ChatOrchestrator:
-    def __init__(self, chat_repo, product_repo, llm=None):
+    def __init__(self, chat_repo, product_repo, llm=None, market_snapshot=None):
         self.llm = llm or GeminiClient()
         self.products = product_repo
         self.chat_repo = chat_repo
+        self.market_snapshot = market_snapshot or get_market_snapshot_service()
+
+    def _institutions(self):
+        try:
+            return self.products.get_institutions() if hasattr(self.products, 'get_institutions') else {}
+        except Exception as e:
+            logger.error(f"Loading institutions failed: {e}")
+            return {}
 
     def handle_chat(self, session_id, user_id, message: str):
         # Load follow-up detection prompt from JSON
@@ -74,6 +84,8 @@ class ChatOrchestrator:
         # 3. Conditional retrieval bypass
         products = []
         category = None
+        # Set when the category-only fallback ran, so the answer does not claim the constraints were met
+        relaxed_constraints = None
         if followup and session_meta and session_meta.get("last_products"):
             logger.info("Follow-up detected, reusing last products from session.")
             if hasattr(self.products, 'get_by_ids'):
@@ -106,12 +118,33 @@ class ChatOrchestrator:
             except Exception as e:
                 logger.error(f"Category classification failed: {e}")
                 category = None
-            filter_dict = {"category": category} if category and category != "Other" else None
+            category_filter = {"category": category} if category and category != "Other" else None
+            # Structured constraints (rates, fees, institution, flags) are pushed down as pre-filters
+            constraints = QueryFilterExtractor(
+                llm=self.llm, prompt_json=SQL_PROMPT_JSON, institutions=self._institutions()
+            ).extract(message)
+            logger.info(f"Extracted constraints: {constraints.to_dict()}")
+            filter_dict = constraints.to_vector_search_filter(category_filter)
+            # Audience is matched locally on eligibility text, so retrieve a few extra to mask
+            limit = 10 if constraints.audience else 5
             try:
-                products = self.products.vector_search(query=message, limit=5, filter=filter_dict)
+                query_vector = self.products.get_query_embedding(message)
+                try:
+                    products = self.products.vector_search(query=message, limit=limit, filter=filter_dict, query_vector=query_vector)
+                except Exception as e:
+                    if filter_dict == category_filter:
+                        raise
+                    # Atlas rejects filters on paths missing from the index until it is rebuilt
+                    logger.error(f"Constrained vector search failed, retrying with category only: {e}")
+                    products = []
+                if not products and filter_dict != category_filter:
+                    # Nothing met the constraints (or older documents lack facets); fall back to the category-only search
+                    products = self.products.vector_search(query=message, limit=limit, filter=category_filter, query_vector=query_vector)
+                    relaxed_constraints = constraints.describe() if products else None
             except Exception as e:
                 logger.error(f"Vector search failed: {e}")
                 products = []
+            products = constraints.apply_audience(products)[:5]
             # 5. Save retrieval context to session
             if hasattr(self.chat_repo, 'save_session_metadata'):
                 self.chat_repo.save_session_metadata(session_id, {
@@ -140,12 +173,21 @@ Similarity Score: {p.get('score')}
             return "\n".join(formatted)
 
         context = build_context(products) if products else "No relevant products found."
+        if relaxed_constraints:
+            context = (
+                f"Note: no product could be confirmed to meet the user's constraints ({relaxed_constraints}). "
+                "The products below match the category only; say so and do not present them as meeting those constraints.\n"
+                + context
+            )
+        # In-memory read only; the snapshot is refreshed in the background
+        finance_snapshot = self.market_snapshot.format_for_prompt()
 
         response_prompt = (
             RESPONSE_PROMPT_JSON["instruction"] + "\n\n" +
             "## Context:\n" +
             f"Chat History:\n{history_str}\n\n" +
             f"Product Context:\n{context}\n\n" +
+            f"Market Snapshot:\n{finance_snapshot}\n\n" +
             f"## User Question:\n{message}\n\n" +
             RESPONSE_PROMPT_JSON["answer_prefix"]
         )
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+
+# datetime/date/UUID/dataclasses are handled natively by orjson
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+# orjson only encodes integers in the signed/unsigned 64-bit range
+_INT_MIN, _INT_MAX = -(2 ** 63), 2 ** 64 - 1
+
+
+def bson_default(obj):
+    """orjson fallback for MongoDB/BSON and other types it does not encode natively."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        obj = obj.to_decimal()
+    if isinstance(obj, Decimal):
+        return _decimal_default(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _decimal_default(value: Decimal):
+    """Integral decimals stay exact where orjson can encode them; anything else degrades instead of raising."""
+    try:
+        if not value.is_finite():
+            # Infinity/NaN: orjson writes non-finite floats as null
+            return float(value)
+        if value == value.to_integral_value():
+            number = int(value)
+            return number if _INT_MIN <= number <= _INT_MAX else float(value)
+        return float(value)
+    except (ArithmeticError, ValueError):
+        return str(value)
+
+
+def dumps(obj, pretty: bool = False) -> str:
+    """Encode to a JSON string; used for embedding documents into LLM prompts."""
+    option = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if pretty else ORJSON_OPTIONS
+    return orjson.dumps(obj, default=bson_default, option=option).decode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded directly with orjson, including BSON types.
+    Returning it from a route skips FastAPI's generic jsonable_encoder pass.
+    """
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=bson_default, option=ORJSON_OPTIONS)
@@ -0,0 +1,136 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+def fingerprint_name(name, digest):
+    root, ext = os.path.splitext(name)
+    return f"{root}.{digest}{ext}"
+
+
+def parse_accept_encoding(header):
+    """Return the set of encodings the client accepts (q=0 entries are dropped)."""
+    accepted = set()
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token)
+    return accepted
+
+
+class StaticAsset:
+    def __init__(self, name, body, media_type):
+        self.name = name
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.variants = {"identity": body}
+        if len(body) >= MIN_COMPRESS_SIZE and media_type.startswith(COMPRESSIBLE_TYPES):
+            self.variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=11)
+
+    def pick_encoding(self, accept_encoding):
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+
+class StaticAssetStore:
+    """
+    Loads the static folder once, precomputes gzip/brotli variants and
+    content-hash fingerprints, and serves them with ETag/304 handling.
+    Fingerprinted URLs (e.g. /static/script.<hash>.js) are cached as immutable;
+    plain URLs and index.html are revalidated on every load.
+    """
+    def __init__(self, directory, url_prefix="/static", index="index.html"):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip("/")
+        self.index = index
+        self.assets = {}
+        self.fingerprinted = {}
+        self.load()
+
+    def load(self):
+        assets = {}
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                full_path = os.path.join(root, filename)
+                name = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+                if media_type.startswith("text/") or media_type == "application/javascript":
+                    media_type += "; charset=utf-8"
+                with open(full_path, "rb") as f:
+                    assets[name] = StaticAsset(name, f.read(), media_type)
+
+        self.assets = assets
+        self.fingerprinted = {
+            fingerprint_name(name, asset.digest): asset
+            for name, asset in assets.items() if name != self.index
+        }
+        if self.index in assets:
+            index = assets[self.index]
+            assets[self.index] = StaticAsset(
+                index.name, self.rewrite_references(index.variants["identity"]), index.media_type
+            )
+
+    def url_for(self, name):
+        asset = self.assets.get(name)
+        if asset is None or name == self.index:
+            return f"{self.url_prefix}/{name}"
+        return f"{self.url_prefix}/{fingerprint_name(name, asset.digest)}"
+
+    def rewrite_references(self, html):
+        """Point index.html at the fingerprinted asset URLs."""
+        text = html.decode("utf-8")
+        pattern = re.compile(r'(src|href)="' + re.escape(self.url_prefix) + r'/([^"?#]+)"')
+        text = pattern.sub(lambda m: f'{m.group(1)}="{self.url_for(m.group(2))}"', text)
+        return text.encode("utf-8")
+
+    def response(self, request: Request, name):
+        asset = self.fingerprinted.get(name)
+        immutable = asset is not None
+        if asset is None:
+            asset = self.assets.get(name)
+        if asset is None:
+            return Response(status_code=404)
+
+        encoding = asset.pick_encoding(request.headers.get("accept-encoding"))
+        etag = f'"{asset.digest}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=headers)
@@ -0,0 +1,56 @@
+import math
+import operator
+from typing import List, Optional
+
+from bson.binary import Binary, BinaryVectorDtype
+
+
+def truncate(vector: List[float], dimensions: Optional[int] = None) -> List[float]:
+    """
+    Keep the leading `dimensions` components and re-normalize.
+    gemini-embedding-001 is trained with Matryoshka loss, so prefixes remain usable embeddings.
+    """
+    if dimensions and dimensions < len(vector):
+        vector = vector[:dimensions]
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else list(vector)
+
+
+def quantize_int8(vector: List[float]) -> List[int]:
+    """Symmetric per-vector scalar quantization to [-127, 127]; cosine ranking is scale-invariant."""
+    max_abs = max((abs(x) for x in vector), default=0.0)
+    if not max_abs:
+        return [0] * len(vector)
+    scale = 127.0 / max_abs
+    return [int(round(x * scale)) for x in vector]
+
+
+def to_int8_binary(vector: List[float], dimensions: Optional[int] = None) -> Binary:
+    """Truncate, quantize and pack as a BSON int8 vector that Atlas Vector Search can index natively."""
+    return Binary.from_vector(quantize_int8(truncate(vector, dimensions)), BinaryVectorDtype.INT8)
+
+
+def vector_search_score(cosine: float) -> float:
+    """Map cosine to Atlas's vectorSearchScore scale for cosine indexes, (1 + cos) / 2."""
+    return (1 + cosine) / 2
+
+
+def rescore(query_vector: List[float], docs: list, limit: int, dimensions: Optional[int] = None) -> list:
+    """
+    Exact second phase of quantized search: score each doc's `embedding` (already cut to
+    `dimensions` by the aggregation) against the query prefix and keep the best `limit`.
+    Scores use the vectorSearchScore scale so both search modes report the same thing.
+    """
+    query = query_vector[:dimensions] if dimensions else query_vector
+    query_norm = math.sqrt(sum(map(operator.mul, query, query)))
+    for doc in docs:
+        embedding = doc.pop("embedding", None)
+        if embedding and query_norm:
+            norm = math.sqrt(sum(map(operator.mul, embedding, embedding)))
+            cosine = sum(map(operator.mul, query, embedding)) / (query_norm * norm) if norm else 0.0
+            doc["score"] = vector_search_score(cosine)
+        else:
+            # Documents without a full-precision vector keep the int8 index score (same scale)
+            doc["score"] = doc["approxScore"]
+    docs.sort(key=lambda doc: doc["score"], reverse=True)
+    return docs[:limit]
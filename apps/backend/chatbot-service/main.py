@@ -1,13 +1,36 @@
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from api import chat, product_chat, compare
-import os
+from core.static_assets import StaticAssetStore
+from core.serialization import FastJSONResponse
+from core.admission import AdmissionController, AdmissionMiddleware
+from services.market_snapshot import get_market_snapshot_service
 
-app = FastAPI(title="FinVerse Chatbot MVP")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Market data is refreshed in the background so /chat never waits on Yahoo Finance
+    market_snapshot = get_market_snapshot_service()
+    market_snapshot.start()
+    yield
+    market_snapshot.stop()
 
-# Mount static folder (optional for serving CSS/JS)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app = FastAPI(title="FinVerse Chatbot MVP", default_response_class=FastJSONResponse, lifespan=lifespan)
+
+# Per-user rate limits, global LLM concurrency cap and load shedding for the chat routes
+admission = AdmissionController.from_settings()
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
+@app.get("/metrics/admission", include_in_schema=False)
+async def admission_metrics():
+    # Counters are per worker process
+    return admission.snapshot()
+
+# Static files are loaded once at startup with precompressed, fingerprinted variants
+static_assets = StaticAssetStore("static")
+
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+def static(path: str, request: Request):
+    return static_assets.response(request, path)
 
 # Include API routers
 app.include_router(chat.router, prefix="/chat")
@@ -15,6 +38,6 @@ app.include_router(product_chat.router, prefix="/product-chat")
 app.include_router(compare.router, prefix="/compare-products")
 
 # Root endpoint serves index.html
-@app.get("/", response_class=FileResponse)
-def root():
-    return os.path.join("static", "index.html")
+@app.api_route("/", methods=["GET", "HEAD"], include_in_schema=False)
+def root(request: Request):
+    return static_assets.response(request, static_assets.index)
@@ -1,5 +1,58 @@
+import json
+import logging
+from cachetools import TTLCache, cached
+from pymongo import UpdateOne
 from pymongo.collection import Collection
 from typing import List, Optional
+from core.config import settings
+from core.vector_quantization import rescore, to_int8_binary
+
+logger = logging.getLogger("llm")
+
+VECTOR_INDEX = "vector_index_finvserv"
+QUANTIZED_VECTOR_INDEX = "vector_index_finvserv_int8"
+# Vectors are only needed inside $vectorSearch/rescoring, never in returned documents
+EMBEDDING_FIELDS = ["embedding", "embedding_int8"]
+# Numeric values parsed from `details` at ingestion (services.query_filters.extract_facets)
+FACETS_FIELD = "facets"
+# Fields that query constraints are pushed down on; each must be a "filter" field in the vector indexes
+FILTER_PATHS = [
+	"category",
+	"institutionId",
+	"isActive",
+	"isFeatured",
+	f"{FACETS_FIELD}.interestRate",
+	f"{FACETS_FIELD}.annualFee",
+	f"{FACETS_FIELD}.minimumBalance",
+	f"{FACETS_FIELD}.processingFee"
+]
+INSTITUTION_CACHE = TTLCache(maxsize=1, ttl=3600)
+
+
+def _index_definition(name: str, vector_field: dict) -> dict:
+	return {
+		"name": name,
+		"type": "vectorSearch",
+		"definition": {
+			"fields": [vector_field] + [{"type": "filter", "path": path} for path in FILTER_PATHS]
+		}
+	}
+
+
+def vector_index_definition() -> dict:
+	"""Atlas Vector Search index over the full-precision embedding."""
+	return _index_definition(VECTOR_INDEX, {"type": "vector", "path": "embedding", "numDimensions": 3072, "similarity": "cosine"})
+
+
+def quantized_index_definition(dimensions: Optional[int] = None) -> dict:
+	"""Atlas Vector Search index over the int8 field written by backfill_quantized_embeddings."""
+	return _index_definition(QUANTIZED_VECTOR_INDEX, {
+		"type": "vector",
+		"path": "embedding_int8",
+		"numDimensions": dimensions or settings.EMBEDDING_DIMENSIONS or 3072,
+		"similarity": "cosine"
+	})
+
 
 class MongoProductRepository:
 	def __init__(self, collection: Collection, embedding_client):
@@ -16,24 +69,112 @@ class MongoProductRepository:
 		print("Embedding length:", len(embedding))  # Debug: check dimension
 		return embedding
 
-	def vector_search(self, query: str, num_candidates: int = 200, limit: int = 5, filter: Optional[dict] = None) -> list:
+	def vector_search(self, query: str, num_candidates: int = 200, limit: int = 5, filter: Optional[dict] = None,
+					  mode: Optional[str] = None, rescore_factor: Optional[int] = None,
+					  query_vector: Optional[List[float]] = None) -> list:
+		"""
+		Semantic product search.
+		:param filter: $vectorSearch pre-filter; may only reference FILTER_PATHS
+		:param query_vector: precomputed embedding of `query`, to avoid re-embedding on retries
+		:param mode: "exact" searches the full-precision embedding; "quantized" retrieves
+			limit * rescore_factor candidates from the int8 field and rescores them exactly
+			against the full-precision embedding. Defaults to settings.VECTOR_SEARCH_MODE.
+		"""
+		query_vector = query_vector or self.get_query_embedding(query)
+		if (mode or settings.VECTOR_SEARCH_MODE) == "quantized":
+			results = self._quantized_search(query_vector, num_candidates, limit, filter, rescore_factor or settings.RESCORE_FACTOR)
+		else:
+			results = self._exact_search(query_vector, num_candidates, limit, filter)
+		for doc in results:
+			print(doc.get("name"), doc.get("score"))  # Debug: print scores
+		return results
+
+	def _exact_search(self, query_vector: List[float], num_candidates: int, limit: int, filter: Optional[dict]) -> list:
 		vector_search_stage = {
 			"$vectorSearch": {
-				"index": "vector_index_finvserv",
+				"index": VECTOR_INDEX,
 				"path": "embedding",
-				"queryVector": self.get_query_embedding(query),
+				"queryVector": query_vector,
 				"numCandidates": num_candidates,
 				"limit": limit
 			}
 		}
 		if filter:
 			vector_search_stage["$vectorSearch"]["filter"] = filter
-		pipeline = [vector_search_stage]
+		pipeline = [
+			vector_search_stage,
+			{"$set": {"score": {"$meta": "vectorSearchScore"}}},
+			{"$unset": EMBEDDING_FIELDS}
+		]
+		return list(self.collection.aggregate(pipeline))
+
+	def _quantized_search(self, query_vector: List[float], num_candidates: int, limit: int, filter: Optional[dict],
+						  rescore_factor: int) -> list:
+		candidates = limit * max(rescore_factor, 1)
+		vector_search_stage = {
+			"$vectorSearch": {
+				"index": QUANTIZED_VECTOR_INDEX,
+				"path": "embedding_int8",
+				"queryVector": to_int8_binary(query_vector, settings.EMBEDDING_DIMENSIONS),
+				"numCandidates": max(num_candidates, candidates),
+				"limit": candidates
+			}
+		}
+		if filter:
+			vector_search_stage["$vectorSearch"]["filter"] = filter
+		rescore_dimensions = settings.RESCORE_DIMENSIONS
+		# Only the prefix used for rescoring leaves the server (a full 3072-d vector is ~42 KB of BSON)
+		embedding_projection = {"$slice": ["$embedding", rescore_dimensions]} if rescore_dimensions else "$embedding"
+		pipeline = [
+			vector_search_stage,
+			{"$set": {"approxScore": {"$meta": "vectorSearchScore"}, "embedding": embedding_projection}},
+			{"$unset": "embedding_int8"}
+		]
 		results = list(self.collection.aggregate(pipeline))
-		for doc in results:
-			print(doc.get("name"), doc.get("score"))  # Debug: print scores
-		return results
+		# Phase two: exact cosine against the full-precision vector for the short candidate list
+		return rescore(query_vector, results, limit, rescore_dimensions)
+
+	def backfill_quantized_embeddings(self, dimensions: Optional[int] = None, batch_size: int = 200, overwrite: bool = False) -> int:
+		"""Write embedding_int8 for documents that only have the full-precision field. Returns the number updated."""
+		dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+		query = {"embedding": {"$exists": True}}
+		if not overwrite:
+			query["embedding_int8"] = {"$exists": False}
+		updated = 0
+		batch = []
+		for doc in self.collection.find(query, {"embedding": 1}):
+			batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"embedding_int8": to_int8_binary(doc["embedding"], dimensions)}}))
+			if len(batch) >= batch_size:
+				updated += self.collection.bulk_write(batch, ordered=False).modified_count
+				batch = []
+		if batch:
+			updated += self.collection.bulk_write(batch, ordered=False).modified_count
+		return updated
+
+	def save_facets(self, product_id, facets: dict):
+		self.collection.update_one({"_id": product_id}, {"$set": {FACETS_FIELD: facets}})
+
+	@cached(INSTITUTION_CACHE, key=lambda self: "institutions")
+	def get_institutions(self) -> dict:
+		"""
+		Institution name -> institutionId, used to recognise institutions in user questions.
+		Products only carry the opaque institutionId; names come from an export of the banking
+		service's Institute table (settings.INSTITUTIONS_FILE, a list of {id, name} or a seed
+		file with an "institutions" array).
+		"""
+		try:
+			with open(settings.INSTITUTIONS_FILE) as f:
+				data = json.load(f)
+		except (OSError, ValueError) as e:
+			logger.warning(f"Institution directory unavailable, institution filters disabled: {e}")
+			return {}
+		if isinstance(data, dict):
+			data = data.get("institutions") or []
+		return {
+			inst["name"]: inst["id"] for inst in data
+			if isinstance(inst, dict) and isinstance(inst.get("name"), str) and inst["name"] and inst.get("id")
+		}
 
 	def get_relevant_products(self, limit: int = 3, filter: Optional[dict] = None) -> list:
 		query = filter or {"isActive": True}
-		return list(self.collection.find(query).limit(limit))
+		return list(self.collection.find(query, {field: 0 for field in EMBEDDING_FIELDS}).limit(limit))
@@ -1,2 +1,21 @@
-
 # Product and category schema for MongoDB should be implemented here if needed
+
+
+def serialize_product(product):
+    """
+    Shape a Mongo product document for API responses and LLM prompts.
+    Dates, ObjectId and Decimal128 values are left as-is and encoded by core.serialization.
+    """
+    if not product:
+        return {}
+    product_id = product.get("_id", "")
+    return {
+        "id": product_id if isinstance(product_id, str) else str(product_id),
+        "name": product.get("name", ""),
+        "categoryId": product.get("categoryId", None),
+        "details": product.get("details", {}),
+        "isFeatured": product.get("isFeatured", None),
+        "isActive": product.get("isActive", None),
+        "createdAt": product.get("createdAt", None),
+        "updatedAt": product.get("updatedAt", None)
+    }
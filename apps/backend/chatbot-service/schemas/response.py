@@ -1,13 +1,25 @@
 from datetime import datetime
+from core.serialization import FastJSONResponse
 
 class APIResponse:
     @staticmethod
     def success(data):
-        return {
+        return FastJSONResponse({
             "success": True,
             "message": "OK",
             "data": data,
             "meta": {
                 "timestamp": datetime.utcnow().isoformat()
             }
-        }
+        })
+
+    @staticmethod
+    def error(message, code, status_code, details=None, headers=None):
+        return FastJSONResponse({
+            "success": False,
+            "message": message,
+            "error": {
+                "code": code,
+                "details": details
+            }
+        }, status_code=status_code, headers=headers)
@@ -0,0 +1,39 @@
+import json
+import logging
+from core.config import settings
+from core.mongo_client import get_mongo_collection
+from repositories.mongo_product_repo import MongoProductRepository, quantized_index_definition, vector_index_definition
+from services.query_filters import extract_facets
+
+logger = logging.getLogger("ingestion")
+
+
+class EmbeddingBackfillService:
+    """
+    Derives search fields from what is already stored on each product: the int8 copy of
+    the existing `embedding` and the numeric filter facets. Embeddings themselves are not
+    (re)generated here, so vectors in the index all come from the original pipeline.
+    """
+    def __init__(self, mongo_collection):
+        self.products = MongoProductRepository(mongo_collection, None)
+
+    def backfill_quantized(self, dimensions=None, overwrite=False):
+        return self.products.backfill_quantized_embeddings(dimensions=dimensions, overwrite=overwrite)
+
+    def backfill_facets(self):
+        count = 0
+        for product in self.products.collection.find({}, {"details": 1}):
+            self.products.save_facets(product["_id"], extract_facets(product.get("details")))
+            count += 1
+        return count
+
+
+if __name__ == "__main__":
+    # Backfill embedding_int8 and filter facets from existing documents (no embedding API calls)
+    logging.basicConfig(level=logging.INFO)
+    service = EmbeddingBackfillService(get_mongo_collection())
+    updated = service.backfill_quantized(overwrite=True)
+    logger.info("Quantized %d embeddings (dimensions=%s)", updated, settings.EMBEDDING_DIMENSIONS or "full")
+    logger.info("Wrote filter facets for %d products", service.backfill_facets())
+    for definition in (vector_index_definition(), quantized_index_definition()):
+        logger.info("Atlas index definition:\n%s", json.dumps(definition, indent=2))
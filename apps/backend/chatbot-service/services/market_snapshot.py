@@ -0,0 +1,173 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from core.config import settings
+
+logger = logging.getLogger("market_snapshot")
+
+# Minimum gap between fetch attempts, so a failing source is not hammered by request-triggered wakeups
+RETRY_SECONDS = 30
+
+
+class FixtureSource:
+    """Reads quotes from a local JSON file; stands in for Yahoo Finance in dev and offline setups."""
+    name = "fixture"
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self):
+        with open(self.path, 'r') as f:
+            return json.load(f)["quotes"]
+
+
+def build_source(name=None):
+    name = name or settings.MARKET_SNAPSHOT_SOURCE
+    if name == "fixture":
+        return FixtureSource(settings.MARKET_SNAPSHOT_FIXTURE)
+    if name == "yahoo":
+        from services.yahoo_finance import YahooFinanceSource
+        return YahooFinanceSource()
+    raise ValueError(f"Unknown market snapshot source: {name}")
+
+
+class MarketSnapshotService:
+    """
+    Keeps a market snapshot in memory and refreshes it on a background thread.
+
+    Requests only ever read the in-memory copy (stale-while-revalidate): a stale snapshot
+    is still served and merely wakes the refresher. Workers share the snapshot through a
+    JSON file; an exclusive file lock makes sure only one of them calls the data source.
+    """
+    def __init__(self, source, cache_path, refresh_seconds=900, max_stale_seconds=86400):
+        self.source = source
+        self.cache_path = cache_path
+        self.lock_path = cache_path + ".lock"
+        self.refresh_seconds = refresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.snapshot = None
+        self._last_attempt = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            build_source(),
+            settings.MARKET_SNAPSHOT_CACHE_PATH,
+            refresh_seconds=settings.MARKET_SNAPSHOT_REFRESH_SECONDS,
+            max_stale_seconds=settings.MARKET_SNAPSHOT_MAX_STALE_SECONDS,
+        )
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self.snapshot = self._read_shared()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="market-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def get_snapshot(self):
+        """Return the current snapshot without blocking, or None if there is none recent enough."""
+        snapshot = self.snapshot
+        if snapshot is None or self._age(snapshot) > self.refresh_seconds:
+            self._wake.set()
+        if snapshot is None or self._age(snapshot) > self.max_stale_seconds:
+            return None
+        return snapshot
+
+    def format_for_prompt(self):
+        snapshot = self.get_snapshot()
+        if not snapshot:
+            return "Not available."
+        as_of = datetime.fromtimestamp(snapshot["fetched_at"], tz=timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+        lines = [f"As of {as_of} (source: {snapshot['source']})"]
+        for quote in snapshot["quotes"].values():
+            unit = quote.get("unit", "")
+            value = f"{quote['value']}{unit}" if unit == "%" else f"{quote['value']} {unit}".strip()
+            lines.append(f"- {quote['label']}: {value}")
+        return "\n".join(lines)
+
+    def refresh(self):
+        """Adopt a fresh shared snapshot if another worker wrote one, otherwise fetch it under the lock."""
+        shared = self._read_shared()
+        if self._is_fresh(shared):
+            self.snapshot = shared
+            return
+        with open(self.lock_path, "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another worker is fetching; its result is picked up on the next cycle
+                return
+            try:
+                shared = self._read_shared()
+                if self._is_fresh(shared):
+                    self.snapshot = shared
+                    return
+                snapshot = {"fetched_at": time.time(), "source": self.source.name, "quotes": self.source.fetch()}
+                self._write_shared(snapshot)
+                self.snapshot = snapshot
+                logger.info("Market snapshot refreshed from %s (%d quotes)", snapshot["source"], len(snapshot["quotes"]))
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Respect RETRY_SECONDS even when requests keep waking us up
+            remaining = RETRY_SECONDS - (time.time() - self._last_attempt)
+            if remaining > 0 and self._stop.wait(remaining):
+                break
+            self._last_attempt = time.time()
+            self._wake.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Market snapshot refresh failed, serving previous snapshot: {e}")
+            timeout = self.refresh_seconds if self._is_fresh(self.snapshot) else RETRY_SECONDS
+            self._wake.wait(timeout=timeout)
+
+    def _age(self, snapshot):
+        return time.time() - snapshot["fetched_at"]
+
+    def _is_fresh(self, snapshot):
+        return bool(snapshot) and self._age(snapshot) < self.refresh_seconds
+
+    def _read_shared(self):
+        """The shared snapshot, or None if missing, unreadable or written by a different source."""
+        try:
+            with open(self.cache_path, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # e.g. a fixture snapshot left in /tmp after switching to yahoo is never served as market data
+        if not isinstance(snapshot, dict) or snapshot.get("source") != self.source.name:
+            return None
+        return snapshot
+
+    def _write_shared(self, snapshot):
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.cache_path)
+
+
+_service = None
+
+
+def get_market_snapshot_service():
+    global _service
+    if _service is None:
+        _service = MarketSnapshotService.from_settings()
+    return _service
@@ -0,0 +1,268 @@
+import json
+import logging
+import re
+from typing import Optional
+from repositories.mongo_product_repo import FACETS_FIELD
+
+logger = logging.getLogger("llm")
+
+# Numeric details fields copied into `facets.<field>` at ingestion so they can be $vectorSearch pre-filters
+# (see FILTER_PATHS in the product repository).
+# Keywords are matched near a number in the user's question to decide which field it constrains.
+NUMERIC_FIELDS = {
+    "interestRate": ("interest rate", "interest", "rate", "apr", "return", "yield", "p.a"),
+    "annualFee": ("annual fee", "yearly fee", "annual charge"),
+    "minimumBalance": ("minimum balance", "min balance", "initial deposit", "opening balance"),
+    "processingFee": ("processing fee", "processing charge"),
+}
+
+# Eligibility is free text, so audiences are applied as a local mask over the retrieved products
+AUDIENCES = {
+    "senior": ("senior", "seniors", "elderly", "retired", "retiree", "pensioner"),
+    "student": ("student", "students", "undergraduate"),
+    "women": ("women", "woman", "ladies", "lady", "female"),
+    "children": ("child", "children", "kids", "minor", "minors", "teen", "teens", "youth"),
+}
+
+_NUMBER = r"(\d+(?:,\d{3})*(?:\.\d+)?)\s*(%|percent\b|k\b|lakhs?\b|mn\b|million\b)?"
+_CURRENCY = r"(?:rs\.?|lkr|usd|\$)?\s*"
+_COMPARATORS = {
+    "$gt": ("above", "over", "more than", "greater than", "higher than", "exceeding"),
+    "$gte": ("at least", "minimum of", "min of", "no less than", ">="),
+    "$lt": ("below", "under", "less than", "lower than", "cheaper than"),
+    "$lte": ("at most", "up to", "maximum of", "max of", "no more than", "not more than", "<="),
+}
+_OPERATOR_SYMBOLS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+_COMPARATOR_RE = re.compile(
+    r"(" + "|".join(re.escape(word) for words in _COMPARATORS.values() for word in words) + r")\s*"
+    + _CURRENCY + _NUMBER
+)
+_BETWEEN_RE = re.compile(r"between\s*" + _CURRENCY + _NUMBER + r"\s*(?:and|to|-)\s*" + _CURRENCY + _NUMBER)
+# Numbers followed by these are tenures ("over 10 years"), never rate/fee/balance values
+_DURATION_RE = re.compile(r"\s*(?:years?|yrs?|months?|mths?|days?|weeks?)\b")
+# A keyword only describes a number within the same clause
+_CLAUSE_BOUNDARY_RE = re.compile(r"[,;]|\b(?:and|with|but|or|for|while)\b")
+# Comparison words with no readable number after them ("seven percent or more"), the only case sent to the LLM
+_UNPARSED_COMPARISON_RE = re.compile(
+    r"\b(" + "|".join(re.escape(word) for words in _COMPARATORS.values() for word in words if word[0].isalpha())
+    + r"|between|or more|or less|or higher|or lower|or above|or below)\b(?!\s*" + _CURRENCY + r"\d)"
+)
+# Other things quoted in percent; a bare percentage next to one of these is not an interest rate
+_PERCENT_NOUNS_RE = re.compile(r"\b(?:cash ?back|discounts?|ltv|loan[ -]to[ -]value|down ?payments?|processing|margin)\b")
+_NO_FEE_RE = re.compile(r"\b(?:no|zero|free of|without(?: an?)?)\s+(annual fee|yearly fee|processing fee)")
+_MULTIPLIERS = {"k": 1_000, "lakh": 100_000, "lakhs": 100_000, "mn": 1_000_000, "million": 1_000_000}
+_FIELD_WINDOW = 40
+
+
+def _to_number(value, unit=None):
+    number = float(value.replace(",", ""))
+    return number * _MULTIPLIERS.get((unit or "").strip().lower(), 1)
+
+
+def extract_facets(details):
+    """
+    Parse numeric facet values out of a product's `details` for pre-filtering.
+    Rates keep the best (highest) figure quoted; fees and balances keep the lowest.
+    """
+    facets = {}
+    for field in NUMERIC_FIELDS:
+        value = (details or {}).get(field)
+        if isinstance(value, bool) or value is None:
+            continue
+        if isinstance(value, (int, float)):
+            facets[field] = float(value)
+            continue
+        text = str(value).lower()
+        parsed = [(_to_number(n, u), u.startswith(("%", "percent"))) for n, u in re.findall(_NUMBER, text)]
+        if field == "interestRate":
+            numbers = [n for n, is_percent in parsed if is_percent] or [n for n, _ in parsed]
+        else:
+            # Fees quoted as a percentage of the loan cannot be compared with absolute amounts
+            numbers = [n for n, is_percent in parsed if not is_percent]
+        if numbers:
+            facets[field] = max(numbers) if field == "interestRate" else min(numbers)
+        elif not parsed and field != "interestRate" and re.search(r"\b(free|nil|none|waived)\b", text):
+            facets[field] = 0.0
+    return facets
+
+
+class QueryConstraints:
+    def __init__(self):
+        self.ranges = {}
+        self.institution = None
+        self.institution_id = None
+        self.flags = {}
+        self.audience = None
+
+    def is_empty(self):
+        return not (self.ranges or self.institution or self.flags or self.audience)
+
+    def to_dict(self):
+        return {"ranges": self.ranges, "institution": self.institution, "flags": self.flags, "audience": self.audience}
+
+    def add_range(self, field, op, value):
+        self.ranges.setdefault(field, {})[op] = value
+
+    def describe(self):
+        """Readable summary of the pushed-down constraints, for telling the LLM what was not applied."""
+        parts = [
+            f"{field} {_OPERATOR_SYMBOLS[op]} {value:g}"
+            for field, bounds in self.ranges.items() for op, value in bounds.items()
+        ]
+        if self.institution:
+            parts.append(f"institution {self.institution}")
+        parts.extend(f"{flag} = {str(value).lower()}" for flag, value in self.flags.items())
+        return ", ".join(parts)
+
+    def to_vector_search_filter(self, base: Optional[dict] = None) -> Optional[dict]:
+        """Combine with an existing filter (e.g. category) into $vectorSearch filter syntax."""
+        clauses = [base] if base else []
+        for field, bounds in self.ranges.items():
+            clauses.append({f"{FACETS_FIELD}.{field}": dict(bounds)})
+        if self.institution_id:
+            clauses.append({"institutionId": self.institution_id})
+        for flag, value in self.flags.items():
+            clauses.append({flag: value})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def apply_audience(self, products):
+        """Local mask on eligibility text; keeps the original list if nothing matches."""
+        if not self.audience:
+            return products
+        keywords = AUDIENCES[self.audience]
+        matched = []
+        for p in products:
+            text = " ".join(str(v) for v in (
+                p.get("name"), p.get("category"), p.get("eligibility"), (p.get("details") or {}).get("eligibility")
+            ) if v).lower()
+            if any(re.search(rf"\b{re.escape(k)}", text) for k in keywords):
+                matched.append(p)
+        return matched or products
+
+
+class QueryFilterExtractor:
+    """
+    Turns a user question into QueryConstraints.
+    Local regex parsing handles the common phrasings; the LLM (user_query_to_sql.json,
+    json_filter section) is only consulted when the question uses a comparison word
+    whose value could not be read locally. Numbers that cannot be attributed to a
+    field unambiguously are dropped rather than guessed.
+    """
+    def __init__(self, llm=None, prompt_json=None, institutions=None):
+        """:param institutions: institution name -> institutionId"""
+        self.llm = llm
+        self.prompt_json = prompt_json
+        self.institutions = institutions or {}
+        self._names = sorted(self.institutions, key=len, reverse=True)
+
+    def extract(self, message: str) -> QueryConstraints:
+        text = message.lower()
+        constraints = QueryConstraints()
+        self._parse_ranges(text, constraints)
+        self._parse_keywords(text, constraints)
+        if not constraints.ranges and self.llm and self.prompt_json and _UNPARSED_COMPARISON_RE.search(text):
+            self._llm_fallback(message, constraints)
+        return constraints
+
+    def _parse_ranges(self, text, constraints):
+        for match in _BETWEEN_RE.finditer(text):
+            unit = match.group(2) or match.group(4)
+            field = self._field_for(text, match, _to_number(match.group(3), match.group(4)), unit)
+            if field:
+                constraints.add_range(field, "$gte", _to_number(match.group(1), match.group(2)))
+                constraints.add_range(field, "$lte", _to_number(match.group(3), match.group(4)))
+        for match in _COMPARATOR_RE.finditer(text):
+            if any(match.start() >= b.start() and match.end() <= b.end() for b in _BETWEEN_RE.finditer(text)):
+                continue
+            value = _to_number(match.group(2), match.group(3))
+            field = self._field_for(text, match, value, match.group(3))
+            if field:
+                op = next(op for op, words in _COMPARATORS.items() if match.group(1) in words)
+                constraints.add_range(field, op, value)
+        for match in _NO_FEE_RE.finditer(text):
+            field = "processingFee" if "processing" in match.group(1) else "annualFee"
+            constraints.add_range(field, "$lte", 0.0)
+
+    def _field_for(self, text, match, value, unit):
+        """
+        Pick the numeric field named closest to the matched number within the same clause.
+        Returns None (drop the constraint) for tenures and for numbers whose nearest keyword
+        belongs to a field the value cannot describe.
+        """
+        if _DURATION_RE.match(text, match.end()):
+            return None
+        before = text[max(0, match.start() - _FIELD_WINDOW):match.start()]
+        after = text[match.end():match.end() + _FIELD_WINDOW]
+        boundaries = list(_CLAUSE_BOUNDARY_RE.finditer(before))
+        if boundaries:
+            before = before[boundaries[-1].end():]
+        boundary = _CLAUSE_BOUNDARY_RE.search(after)
+        if boundary:
+            after = after[:boundary.start()]
+
+        is_percent = bool(unit) and unit.startswith(("%", "percent"))
+        candidates = []
+        for field, keywords in NUMERIC_FIELDS.items():
+            for keyword in keywords:
+                if keyword in before:
+                    candidates.append((len(before) - before.rfind(keyword) - len(keyword), field))
+                if keyword in after:
+                    candidates.append((after.find(keyword), field))
+        if not candidates:
+            # A bare percentage ("savings above 7%") is a rate unless the clause names something else quoted in percent
+            return "interestRate" if is_percent and not _PERCENT_NOUNS_RE.search(before + " " + after) else None
+        field = min(candidates)[1]
+        # Percentages only describe rates, and "rate" next to a large plain amount is not a rate
+        if (field != "interestRate" and is_percent) or (field == "interestRate" and not is_percent and value > 100):
+            return None
+        return field
+
+    def _parse_keywords(self, text, constraints):
+        if re.search(r"\bfeatured\b", text):
+            constraints.flags["isFeatured"] = True
+        if re.search(r"\b(active|currently (?:available|offered))\b", text):
+            constraints.flags["isActive"] = True
+        for name in self._names:
+            if re.search(rf"\b{re.escape(name.lower())}\b", text):
+                constraints.institution = name
+                constraints.institution_id = self.institutions[name]
+                break
+        for audience, keywords in AUDIENCES.items():
+            if any(re.search(rf"\b{re.escape(k)}\b", text) for k in keywords):
+                constraints.audience = audience
+                break
+
+    def _llm_fallback(self, message, constraints):
+        spec = self.prompt_json["json_filter"]
+        prompt = (
+            spec["instruction"] + "\n\n" +
+            "Format: " + json.dumps(spec["format"]) + "\n" +
+            "Examples:\n" + "\n".join(f"User: {e['user']}\nJSON: {json.dumps(e['json'])}" for e in spec["examples"]) + "\n\n" +
+            f"User: {message}\nJSON:"
+        )
+        try:
+            raw = self.llm.generate_json(prompt)
+            parsed = json.loads(raw[raw.index("{"):raw.rindex("}") + 1])
+        except Exception as e:
+            logger.error(f"Filter extraction LLM fallback failed: {e}")
+            return
+        # Only whitelisted fields and numeric bounds are accepted from the LLM
+        for field in NUMERIC_FIELDS:
+            bounds = parsed.get(field) or {}
+            if not isinstance(bounds, dict):
+                continue
+            for key, op in (("min", "$gte"), ("max", "$lte")):
+                value = bounds.get(key)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    constraints.add_range(field, op, float(value))
+        for flag in ("isActive", "isFeatured"):
+            if isinstance(parsed.get(flag), bool):
+                constraints.flags[flag] = parsed[flag]
+        institution = parsed.get("institution")
+        if isinstance(institution, str):
+            known = {name.lower(): name for name in self.institutions}
+            if institution.lower() in known:
+                constraints.institution = known[institution.lower()]
+                constraints.institution_id = self.institutions[constraints.institution]
@@ -1,11 +1,33 @@
-# import yfinance as yf
-# from functools import lru_cache
+import yfinance as yf
 
-# class YahooFinanceService:
+# Snapshot key -> (Yahoo symbol, label, unit)
+TICKERS = {
+    "us_13w_tbill": ("^IRX", "US 13-Week T-Bill Yield", "%"),
+    "us_10y_treasury": ("^TNX", "US 10-Year Treasury Yield", "%"),
+    "usd_lkr": ("USDLKR=X", "USD/LKR Exchange Rate", "LKR"),
+    "gold": ("GC=F", "Gold Futures", "USD/oz"),
+}
 
-#     @lru_cache(maxsize=1)
-#     def get_snapshot(self):
-#         t = yf.Ticker("^IRX")
-#         return {
-#             "interestRate": t.info.get("regularMarketPrice")
-#         }
+
+class YahooFinanceSource:
+    """
+    Market data source backed by yfinance. Calls are blocking network I/O,
+    so this is only used from MarketSnapshotService's background refresh.
+    """
+    name = "yahoo"
+
+    def __init__(self, tickers=None):
+        self.tickers = tickers or TICKERS
+
+    def fetch(self):
+        quotes = {}
+        for key, (symbol, label, unit) in self.tickers.items():
+            try:
+                price = yf.Ticker(symbol).fast_info["last_price"]
+            except Exception:
+                continue
+            if price is not None:
+                quotes[key] = {"label": label, "value": round(float(price), 4), "unit": unit}
+        if not quotes:
+            raise RuntimeError("Yahoo Finance returned no quotes")
+        return quotes
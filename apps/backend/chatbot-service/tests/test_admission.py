@@ -0,0 +1,129 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from core.admission import AdmissionController, AdmissionMiddleware, AdmissionRejected
+
+
+def controller(max_concurrent=1, max_queue=8, queue_deadline=5.0, user_rate_per_minute=600, user_burst=100):
+    return AdmissionController(max_concurrent, max_queue, queue_deadline, user_rate_per_minute, user_burst)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_queued_requests_start_in_priority_order():
+    async def scenario():
+        admission = controller()
+        await admission.acquire("holder", 0)
+        started = []
+
+        async def request(priority):
+            await admission.acquire(f"user-{priority}", priority)
+            started.append(priority)
+
+        tasks = [asyncio.create_task(request(p)) for p in (2, 0, 1)]
+        await settle()
+        assert admission.snapshot()["queued"] == 3
+        for _ in tasks:
+            admission.release()
+            await settle()
+        await asyncio.gather(*tasks)
+        return started, admission
+
+    started, admission = asyncio.run(scenario())
+    assert started == [0, 1, 2]
+    assert admission.active == 1
+
+
+def test_full_queue_evicts_lower_priority_waiter():
+    async def scenario():
+        admission = controller(max_queue=1)
+        await admission.acquire("holder", 0)
+        low = asyncio.create_task(admission.acquire("low", 2))
+        await settle()
+        high = asyncio.create_task(admission.acquire("high", 0))
+        await settle()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await low
+        # An equal-priority arrival cannot evict and is shed instead
+        with pytest.raises(AdmissionRejected) as queue_full:
+            await admission.acquire("same", 0)
+        admission.release()
+        await high
+        return admission, rejected.value, queue_full.value
+
+    admission, rejected, queue_full = asyncio.run(scenario())
+    assert rejected.reason == "evicted"
+    assert queue_full.reason == "queue_full"
+    assert admission.metrics.shed == {(2, "evicted"): 1, (0, "queue_full"): 1}
+    assert admission.active == 1
+
+
+def test_waiter_is_shed_after_queue_deadline():
+    async def scenario():
+        admission = controller(queue_deadline=0.05)
+        await admission.acquire("holder", 0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("late", 1)
+        admission.release()
+        return admission, rejected.value
+
+    admission, rejected = asyncio.run(scenario())
+    assert rejected.reason == "deadline"
+    assert rejected.retry_after == 0.05
+    assert admission.active == 0
+    assert admission.snapshot()["queued"] == 0
+
+
+def test_cancelled_waiter_hands_on_granted_slot():
+    async def scenario():
+        admission = controller()
+        await admission.acquire("holder", 0)
+        granted = asyncio.create_task(admission.acquire("granted", 0))
+        queued = asyncio.create_task(admission.acquire("queued", 1))
+        await settle()
+        # The slot is handed to `granted`, whose client disconnects before it runs
+        admission.release()
+        granted.cancel()
+        await settle()
+        assert granted.cancelled()
+        await queued
+        assert admission.active == 1
+        # A waiter cancelled before being granted leaves no slot behind
+        abandoned = asyncio.create_task(admission.acquire("abandoned", 1))
+        await settle()
+        abandoned.cancel()
+        await settle()
+        admission.release()
+        return admission
+
+    admission = asyncio.run(scenario())
+    assert admission.active == 0
+    assert admission.snapshot()["queued"] == 0
+
+
+def test_rate_limited_request_gets_429_with_retry_after():
+    app = FastAPI()
+
+    @app.post("/chat")
+    def chat():
+        return {"ok": True}
+
+    admission = controller(max_concurrent=4, user_rate_per_minute=6, user_burst=1)
+    app.add_middleware(AdmissionMiddleware, controller=admission)
+    client = TestClient(app)
+    headers = {"x-user-id": "demo-user", "x-forwarded-for": "198.51.100.7, 203.0.113.5"}
+
+    assert client.post("/chat", headers=headers).status_code == 200
+    response = client.post("/chat", headers=headers)
+    assert response.status_code == 429
+    assert response.json()["error"]["code"] == "RATE_LIMITED"
+    assert response.headers["Retry-After"] == "10"
+    # Same user id from another client address has its own bucket
+    other = {"x-user-id": "demo-user", "x-forwarded-for": "203.0.113.9"}
+    assert client.post("/chat", headers=other).status_code == 200
+    assert admission.metrics.shed == {(1, "rate_limited"): 1}
+    assert admission.active == 0
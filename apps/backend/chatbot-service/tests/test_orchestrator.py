@@ -0,0 +1,68 @@
+from core.orchestrator import ChatOrchestrator
+
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, user_prompt, context=""):
+        self.prompts.append(user_prompt)
+        return "Savings" if user_prompt.rstrip().endswith("Category:") else "answer"
+
+
+class FakeChatRepo:
+    def get_recent_messages(self, session_id, limit=5):
+        return []
+
+    def save_message(self, session_id, user_id, role, content):
+        pass
+
+
+class FakeMarketSnapshot:
+    def format_for_prompt(self):
+        return "Not available."
+
+
+class FakeProductRepo:
+    def __init__(self, constrained_results):
+        self.constrained_results = constrained_results
+        self.filters = []
+
+    def get_query_embedding(self, query):
+        return [0.1, 0.2]
+
+    def vector_search(self, query, limit=5, filter=None, query_vector=None):
+        self.filters.append(filter)
+        if filter == {"category": "Savings"}:
+            return [{"name": "Everyday Saver", "category": "Savings", "details": {"interestRate": "6%"}}]
+        if isinstance(self.constrained_results, Exception):
+            raise self.constrained_results
+        return self.constrained_results
+
+
+def chat(product_repo, message="savings accounts above 7%"):
+    llm = FakeLLM()
+    ChatOrchestrator(FakeChatRepo(), product_repo, llm=llm, market_snapshot=FakeMarketSnapshot()).handle_chat("s", "u", message)
+    return llm.prompts[-1]
+
+
+def test_unindexed_filter_error_falls_back_to_category():
+    products = FakeProductRepo(RuntimeError("Path 'facets.interestRate' needs to be indexed as filter"))
+    prompt = chat(products)
+    assert products.filters[-1] == {"category": "Savings"}
+    assert "Everyday Saver" in prompt
+    assert "interestRate > 7" in prompt
+
+
+def test_relaxed_constraints_are_flagged_in_prompt():
+    prompt = chat(FakeProductRepo([]))
+    assert "Everyday Saver" in prompt
+    assert "no product could be confirmed to meet the user's constraints (interestRate > 7)" in prompt
+
+
+def test_constrained_results_are_not_flagged():
+    products = FakeProductRepo([{"name": "High Yield Saver", "category": "Savings", "details": {}}])
+    prompt = chat(products)
+    assert len(products.filters) == 1
+    assert "High Yield Saver" in prompt
+    assert "could be confirmed" not in prompt
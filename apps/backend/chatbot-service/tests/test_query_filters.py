@@ -0,0 +1,74 @@
+import pytest
+from services.query_filters import QueryFilterExtractor
+
+INSTITUTIONS = {"Bank of Ceylon": "inst-boc", "Commercial Bank": "inst-combank"}
+
+
+class FakeLLM:
+    def __init__(self, response="{}"):
+        self.response = response
+        self.prompts = []
+
+    def generate_json(self, prompt):
+        self.prompts.append(prompt)
+        return self.response
+
+
+@pytest.mark.parametrize("message, ranges", [
+    ("savings accounts above 7% for seniors", {"interestRate": {"$gt": 7.0}}),
+    ("fixed deposits between 8% and 10% interest", {"interestRate": {"$gte": 8.0, "$lte": 10.0}}),
+    ("credit cards with annual fee less than 3k", {"annualFee": {"$lt": 3000.0}}),
+    ("accounts with minimum balance under Rs. 5,000", {"minimumBalance": {"$lt": 5000.0}}),
+    ("credit cards with no annual fee", {"annualFee": {"$lte": 0.0}}),
+    ("home loan under 12% interest with tenure over 10 years", {"interestRate": {"$lt": 12.0}}),
+    ("loans with processing fee below 1%", {}),
+    ("personal loans at most 15% with a processing fee under 5,000", {"interestRate": {"$lte": 15.0}, "processingFee": {"$lt": 5000.0}}),
+    ("fixed deposits over 12 months", {}),
+    ("cards with cashback over 5%", {}),
+    ("credit cards offering a discount above 10%", {}),
+    ("home loans with ltv over 80%", {}),
+    ("vehicle loans with down payment under 20%", {}),
+    ("personal loans with processing charges below 2%", {}),
+    ("cashback cards, interest under 24%", {"interestRate": {"$lt": 24.0}}),
+])
+def test_ranges(message, ranges):
+    assert QueryFilterExtractor().extract(message).ranges == ranges
+
+
+@pytest.mark.parametrize("message, calls_llm", [
+    ("What is the interest rate of the BOC savings account?", False),
+    ("fd rates for 12 months", False),
+    ("savings accounts above 7%", False),
+    ("loans with processing fee below 1%", False),
+    ("savings accounts paying seven percent or more", True),
+    ("cards with an annual fee under five thousand", True),
+])
+def test_llm_fallback_only_for_unparsed_comparisons(message, calls_llm):
+    llm = FakeLLM()
+    QueryFilterExtractor(llm=llm, prompt_json={"json_filter": {"instruction": "", "format": {}, "examples": []}}).extract(message)
+    assert bool(llm.prompts) == calls_llm
+
+
+def test_institution_filters_on_institution_id():
+    constraints = QueryFilterExtractor(institutions=INSTITUTIONS).extract("Bank of Ceylon savings above 6%")
+    assert constraints.institution == "Bank of Ceylon"
+    assert constraints.to_vector_search_filter({"category": "savings"}) == {"$and": [
+        {"category": "savings"},
+        {"facets.interestRate": {"$gt": 6.0}},
+        {"institutionId": "inst-boc"},
+    ]}
+
+
+def test_llm_institution_resolved_to_id():
+    llm = FakeLLM('{"interestRate": {"min": 7, "max": null}, "institution": "commercial bank"}')
+    prompt_json = {"json_filter": {"instruction": "", "format": {}, "examples": []}}
+    constraints = QueryFilterExtractor(llm=llm, prompt_json=prompt_json, institutions=INSTITUTIONS).extract(
+        "deposits from Commercial Bank paying seven percent or more"
+    )
+    assert constraints.ranges == {"interestRate": {"$gte": 7.0}}
+    assert constraints.institution_id == "inst-combank"
+
+
+def test_describe_constraints():
+    constraints = QueryFilterExtractor(institutions=INSTITUTIONS).extract("featured Bank of Ceylon savings above 6.5%")
+    assert constraints.describe() == "interestRate > 6.5, institution Bank of Ceylon, isFeatured = true"